@@ -2,6 +2,8 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 
+from budget_ui import EXTENDED
+
 st.set_page_config(page_title="Priority-Aware Budget Assistant", layout="centered")
 
 st.title("Priority-Aware Budget Assistant")
@@ -20,22 +22,13 @@ with col2:
 
 st.markdown("Define category budgets and priorities (1 = low priority, 5 = high priority).")
 
-default_categories = [
-    {"category": "Groceries", "budget": 350.0, "priority": 5},
-    {"category": "Eating out", "budget": 250.0, "priority": 3},
-    {"category": "Leisure", "budget": 200.0, "priority": 2},
-    {"category": "Transport", "budget": 100.0, "priority": 4},
-]
-
 n_categories = st.slider("Number of categories", min_value=2, max_value=6, value=4)
 
 categories = []
 for i in range(n_categories):
     st.subheader(f"Category {i+1}")
 
-    default_name = default_categories[i]["category"] if i < len(default_categories) else f"Category {i+1}"
-    default_budget = default_categories[i]["budget"] if i < len(default_categories) else 100.0
-    default_priority = default_categories[i]["priority"] if i < len(default_categories) else 3
+    default_name, default_budget, default_priority = EXTENDED[i]
 
     c1, c2, c3 = st.columns([2, 1, 1])
     with c1:
@@ -204,10 +197,12 @@ def suggest_transfers_to_target(df: pd.DataFrame, target_category: str, amount_n
     - Cap at 30% of source budget (avoid extreme changes)
     - Never reduce source below spent_so_far (ensured by using 'remaining')
     """
-    if amount_needed <= 0:
+    # Cheap scalar checks first: nothing to cover, or no category has budget left
+    if amount_needed <= 0 or not (df["remaining"].to_numpy() > 0).any():
         return pd.DataFrame()
 
-    candidates = df[(df["category"] != target_category) & (df["remaining"] > 0)].copy()
+    # No .copy() needed: candidates is only read (and sort_values returns a new frame anyway)
+    candidates = df[(df["category"] != target_category) & (df["remaining"] > 0)]
     if candidates.empty:
         return pd.DataFrame()
 
@@ -284,6 +279,7 @@ else:
         budget_map = budgets_df.set_index("category")["budget"].to_dict()
         spent_map = budgets_df.set_index("category")["spent_so_far"].to_dict()
 
+        lines = []
         for _, row in transfers_df.iterrows():
             from_cat = str(row["from_category"])
             moved = float(row["amount_moved"])
@@ -293,11 +289,12 @@ else:
             spent_so_far = float(spent_map.get(from_cat, 0.0))
             remaining_here = float(remaining_map.get(from_cat, 0.0))
 
-            st.markdown(
+            lines.append(
                 f"- **Move €{moved:,.0f}** from **{from_cat}** → **{target_cat}**  \n"
                 f"  **Why:** {from_cat} has priority **{prio}** and still has **€{remaining_here:,.0f}** remaining "
                 f"(planned €{planned_budget:,.0f}, spent €{spent_so_far:,.0f})."
             )
+        st.markdown("\n".join(lines))
 
         uncovered = float(transfers_df.attrs.get("uncovered_amount", 0.0))
         if uncovered > 0:
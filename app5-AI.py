@@ -2,155 +2,28 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 
+from budget_core import (
+    DAYS_IN_MONTH,
+    GLOBAL_SEED,
+    forecast_end_of_month,
+    get_rng,
+    highlight_gap,
+    history_and_curve,
+    suggest_transfers_to_target,
+)
+from budget_ui import EXTENDED
+
 # -----------------------------
-# Global config (reproducible data)
+# Global config (seed, month length and helpers live in budget_core.py)
 # -----------------------------
-GLOBAL_SEED = 42
-DAYS_IN_MONTH = 30
+# Filtered frames share data until written to, so no defensive .copy() is needed
+pd.options.mode.copy_on_write = True
 
 st.set_page_config(page_title="Priority-Aware Budget Assistant", layout="centered")
 st.title("Priority-Aware Budget Assistant")
 st.caption("Prototype of an AI-assisted dynamic budgeting feature for a banking app.")
 
 
-# -----------------------------
-# Data + AI-lite helpers
-# -----------------------------
-def simulate_transaction_history(categories_df: pd.DataFrame, n_months: int = 3, seed: int = GLOBAL_SEED) -> pd.DataFrame:
-    """
-    Create synthetic transaction-level history for the last n_months.
-    Output columns: month_idx, day, category, amount
-    """
-    rng = np.random.default_rng(seed)
-    rows = []
-
-    for m in range(1, n_months + 1):
-        for _, r in categories_df.iterrows():
-            cat = str(r["category"])
-            budget = float(r["budget"])
-            daily_mean = budget / DAYS_IN_MONTH
-
-            for d in range(1, DAYS_IN_MONTH + 1):
-                # typical number of transactions per day
-                n_tx = rng.poisson(lam=0.9)
-                for _ in range(n_tx):
-                    # lognormal → small tx most days, occasional bigger tx
-                    amt = rng.lognormal(mean=np.log(max(daily_mean, 1e-6)), sigma=0.6)
-                    rows.append({"month_idx": m, "day": d, "category": cat, "amount": float(amt)})
-
-    return pd.DataFrame(rows)
-
-
-def build_avg_cumulative_curve(history_tx: pd.DataFrame) -> pd.DataFrame:
-    """
-    Compute average cumulative spend fraction curve per day, per category.
-    Output: category, day, avg_cum_frac (clipped to [0.01, 0.99])
-    """
-    if history_tx.empty:
-        return pd.DataFrame(columns=["category", "day", "avg_cum_frac"])
-
-    daily = (
-        history_tx.groupby(["month_idx", "category", "day"], as_index=False)["amount"].sum()
-        .sort_values(["month_idx", "category", "day"])
-    )
-
-    all_months = daily["month_idx"].unique()
-    all_cats = daily["category"].unique()
-
-    full_index = pd.MultiIndex.from_product(
-        [all_months, all_cats, range(1, DAYS_IN_MONTH + 1)],
-        names=["month_idx", "category", "day"],
-    )
-
-    daily = (
-        daily.set_index(["month_idx", "category", "day"])
-        .reindex(full_index, fill_value=0)
-        .reset_index()
-    )
-
-    daily["cum_spend"] = daily.groupby(["month_idx", "category"])["amount"].cumsum()
-    monthly_total = daily.groupby(["month_idx", "category"])["amount"].transform("sum")
-
-    daily["cum_frac"] = np.where(monthly_total > 0, daily["cum_spend"] / monthly_total, 0.0)
-
-    curve = daily.groupby(["category", "day"], as_index=False)["cum_frac"].mean()
-    curve = curve.rename(columns={"cum_frac": "avg_cum_frac"})
-    curve["avg_cum_frac"] = curve["avg_cum_frac"].clip(lower=0.01, upper=0.99)
-
-    return curve
-
-
-def forecast_end_of_month(spent_so_far: float, day: int, avg_curve: pd.DataFrame, category_name: str) -> float:
-    """
-    Forecast EOM spend using historical cumulative fraction curve:
-        forecast = spent_so_far / avg_cum_frac(day)
-    Fallback: simple pace if curve missing.
-    """
-    curve_day = avg_curve[(avg_curve["category"] == category_name) & (avg_curve["day"] == day)]
-    if curve_day.empty:
-        return spent_so_far * (DAYS_IN_MONTH / max(day, 1))
-
-    frac = float(curve_day["avg_cum_frac"].iloc[0])
-    frac = max(0.01, min(0.99, frac))
-    return spent_so_far / frac
-
-
-def suggest_transfers_to_target(df: pd.DataFrame, target_category: str, amount_needed: float) -> pd.DataFrame:
-    """
-    Suggest transfers FROM other categories TO the target category.
-    - lowest priority first
-    - only from categories with remaining budget
-    - cap at 30% of source budget
-    - never reduce below already spent (ensured via remaining)
-    """
-    if amount_needed <= 0:
-        return pd.DataFrame()
-
-    candidates = df[(df["category"] != target_category) & (df["remaining"] > 0)].copy()
-    if candidates.empty:
-        return pd.DataFrame()
-
-    candidates = candidates.sort_values(by=["priority", "remaining", "budget"], ascending=[True, False, False])
-
-    transfers = []
-    remaining_needed = amount_needed
-
-    for _, r in candidates.iterrows():
-        if remaining_needed <= 0:
-            break
-
-        max_reducible = 0.30 * float(r["budget"])
-        safe_reducible = min(max_reducible, float(r["remaining"]))
-        move_amount = min(safe_reducible, remaining_needed)
-
-        if move_amount > 0:
-            transfers.append(
-                {
-                    "from_category": str(r["category"]),
-                    "from_priority": int(r["priority"]),
-                    "to_category": target_category,
-                    "amount_moved": float(move_amount),
-                }
-            )
-            remaining_needed -= move_amount
-
-    out = pd.DataFrame(transfers)
-    if not out.empty:
-        out.attrs["uncovered_amount"] = float(max(0.0, remaining_needed))
-    return out
-
-
-def highlight_gap(val):
-    # overspend positive → red; surplus negative/zero → green
-    try:
-        v = float(val)
-    except Exception:
-        return ""
-    if v > 0:
-        return "color: red; font-weight: 700;"
-    return "color: green;"
-
-
 # -----------------------------
 # 1) Budget setup
 # -----------------------------
@@ -164,22 +37,13 @@ with col2:
 
 st.markdown("Define category budgets and priorities (1 = low priority, 5 = high priority).")
 
-default_categories = [
-    {"category": "Groceries", "budget": 350.0, "priority": 5},
-    {"category": "Eating out", "budget": 250.0, "priority": 3},
-    {"category": "Leisure", "budget": 200.0, "priority": 2},
-    {"category": "Transport", "budget": 100.0, "priority": 4},
-]
-
 n_categories = st.slider("Number of categories", min_value=2, max_value=6, value=4)
 
 categories = []
 for i in range(n_categories):
     st.subheader(f"Category {i+1}")
 
-    default_name = default_categories[i]["category"] if i < len(default_categories) else f"Category {i+1}"
-    default_budget = default_categories[i]["budget"] if i < len(default_categories) else 100.0
-    default_priority = default_categories[i]["priority"] if i < len(default_categories) else 3
+    default_name, default_budget, default_priority = EXTENDED[i]
 
     c1, c2, c3 = st.columns([2, 1, 1])
     with c1:
@@ -198,6 +62,11 @@ if len(categories) == 0:
 
 budgets_df = pd.DataFrame(categories)
 
+# One categorical dtype (table order) for the category column of every frame below; the
+# synthetic history and curve are built on the same names, in the same order
+cat_dtype = pd.CategoricalDtype(categories=pd.unique(budgets_df["category"]))
+budgets_df["category"] = budgets_df["category"].astype(cat_dtype)
+
 # Allocation check (informative)
 total_planned = float(budgets_df["budget"].sum())
 allocation_gap = float(total_budget - total_planned)
@@ -259,14 +128,12 @@ else:
     noise_mult = style_params[style]["noise_multiplier"]
 
     # fixed seed so the same inputs produce the same simulated spending
-    rng_current = np.random.default_rng(GLOBAL_SEED)
+    rng_current = get_rng(GLOBAL_SEED)
 
-    spending = []
-    for _, r in budgets_df.iterrows():
-        budget = float(r["budget"])
-        expected_spent = budget * mean_mult * (day / DAYS_IN_MONTH)
-        simulated_spent = rng_current.normal(loc=expected_spent, scale=budget * noise_mult)
-        spending.append(float(max(0.0, simulated_spent)))
+    # one standard-normal draw for all categories, scaled and shifted per category
+    budgets = budgets_df["budget"].to_numpy()
+    expected_spent = budgets * mean_mult * (day / DAYS_IN_MONTH)
+    spending = np.maximum(0.0, expected_spent + budgets * noise_mult * rng_current.standard_normal(budgets.size))
 
 # common computed columns
 budgets_df["spent_so_far"] = spending
@@ -290,34 +157,33 @@ st.write(
     "The prototype generates a **synthetic but reproducible** transaction history and uses it to forecast end-of-month spending."
 )
 
-history_tx = simulate_transaction_history(budgets_df[["category", "budget"]], n_months=3, seed=GLOBAL_SEED)
-avg_curve = build_avg_cumulative_curve(history_tx)
+# Hashable (category, budget) pairs in table order (the order drives the seeded draws)
+cats_budgets = tuple((c["category"], c["budget"]) for c in categories)
 
-with st.expander("See sample synthetic transactions (data)"):
-    st.dataframe(history_tx.head(20), use_container_width=True)
+# The forecast only depends on the categories/budgets, the day and current spending: rebuild it
+# when those change, otherwise (e.g. priority edits, apply toggle) reuse it from the session.
+# The history/curve behind it stay in st.cache_data, so they survive across sessions too.
+pipeline_key = hash((cats_budgets, day, tuple(spending)))
+if st.session_state.get("pipeline_key") != pipeline_key:
+    history_tx, curve_map = history_and_curve(cats_budgets, n_months=3, seed=GLOBAL_SEED)
+
+    forecast = forecast_end_of_month(budgets_df["spent_so_far"].to_numpy(), day, curve_map, budgets_df["category"])
 
-forecast_rows = []
-for _, r in budgets_df.iterrows():
-    cat = str(r["category"])
-    spent = float(r["spent_so_far"])
-    budget = float(r["budget"])
-    forecast = float(forecast_end_of_month(spent, day, avg_curve, cat))
-    gap = forecast - budget  # >0 overspend, <0 surplus
-
-    forecast_rows.append(
-        {
-            "category": cat,
-            "budget": budget,
-            "spent_so_far": spent,
-            "forecast_end_month": forecast,
-            "forecast_overspend_vs_budget": gap,
-        }
+    forecast_df = budgets_df[["category", "budget", "spent_so_far"]].assign(
+        forecast_end_month=forecast,
+        forecast_overspend_vs_budget=forecast - budgets_df["budget"].to_numpy(),  # >0 overspend, <0 surplus
     )
 
-forecast_df = pd.DataFrame(forecast_rows)
+    st.session_state["pipeline"] = (history_tx, forecast_df)
+    st.session_state["pipeline_key"] = pipeline_key
+
+history_tx, forecast_df = st.session_state["pipeline"]
+
+with st.expander("See sample synthetic transactions (data)"):
+    st.dataframe(history_tx.head(20), use_container_width=True)
 
 # Styled forecast table (red overspend, green surplus)
-styled_forecast = forecast_df.style.applymap(highlight_gap, subset=["forecast_overspend_vs_budget"])
+styled_forecast = forecast_df.style.apply(highlight_gap, subset=["forecast_overspend_vs_budget"])
 
 st.dataframe(
     styled_forecast,
@@ -335,7 +201,7 @@ st.divider()
 # -----------------------------
 st.header("4) Reallocation recommendation")
 
-candidates = forecast_df[forecast_df["forecast_overspend_vs_budget"] > 0].copy()
+candidates = forecast_df[forecast_df["forecast_overspend_vs_budget"] > 0]
 
 if candidates.empty:
     st.success("No category is forecasted to exceed its budget. No reallocation needed.")
@@ -353,15 +219,13 @@ else:
     else:
         # easy-to-read suggestions
         remaining_map = budgets_df.set_index("category")["remaining"].to_dict()
-        for _, row in transfers_df.iterrows():
-            from_cat = str(row["from_category"])
-            moved = float(row["amount_moved"])
-            prio = int(row["from_priority"])
-            rem = float(remaining_map.get(from_cat, 0.0))
+        for row in transfers_df.itertuples(index=False):
+            from_cat = row.from_category
+            rem = remaining_map.get(from_cat, 0.0)
 
             st.markdown(
-                f"- **Move €{moved:,.0f}** from **{from_cat}** → **{target_cat}**  \n"
-                f"  *Why:* {from_cat} is priority **{prio}** and still has about **€{rem:,.0f}** remaining."
+                f"- **Move €{row.amount_moved:,.0f}** from **{from_cat}** → **{target_cat}**  \n"
+                f"  *Why:* {from_cat} is priority **{row.from_priority}** and still has about **€{rem:,.0f}** remaining."
             )
 
         uncovered = float(transfers_df.attrs.get("uncovered_amount", 0.0))
@@ -375,9 +239,9 @@ else:
         if apply:
             new_df = budgets_df.copy()
 
-            # reduce source budgets
-            for _, t in transfers_df.iterrows():
-                new_df.loc[new_df["category"] == t["from_category"], "budget"] -= t["amount_moved"]
+            # reduce source budgets (all at once, matched by category name)
+            moved_by_cat = transfers_df.groupby("from_category", sort=False)["amount_moved"].sum()
+            new_df["budget"] = new_df["budget"].sub(new_df["category"].map(moved_by_cat), fill_value=0)
 
             # increase target budget
             moved_total = float(transfers_df["amount_moved"].sum())
@@ -0,0 +1,164 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+
+# -----------------------------
+# Shared data + forecasting helpers for app5-AI.py (no page layout here)
+# -----------------------------
+GLOBAL_SEED = 42
+DAYS_IN_MONTH = 30
+
+
+def get_rng(seed: int = GLOBAL_SEED) -> np.random.Generator:
+    """
+    Fresh Generator for `seed` on every call, so the same inputs keep producing the same draws.
+    Not shared between callers: Streamlit sessions run in separate threads. Reuse across reruns
+    comes from the cached history_and_curve instead.
+    """
+    return np.random.default_rng(seed)
+
+
+def simulate_transaction_history(categories_df: pd.DataFrame, n_months: int = 3, seed: int = GLOBAL_SEED) -> pd.DataFrame:
+    """
+    Create synthetic transaction-level history for the last n_months.
+    Output columns: month_idx, day, category, amount
+    """
+    rng = get_rng(seed)
+    cat_codes, cat_names = pd.factorize(categories_df["category"].astype(str))
+    budgets = categories_df["budget"].to_numpy(dtype=float)
+    shape = (n_months, len(cat_codes), DAYS_IN_MONTH)
+
+    # typical number of transactions per day, drawn for every (month, category, day) at once
+    counts = rng.poisson(lam=0.9, size=shape).ravel()
+
+    # lognormal → small tx most days, occasional bigger tx: one standard-normal buffer for all
+    # transactions, transformed in place as exp(mu + 0.6 * z)
+    log_daily_means = np.log(np.maximum(budgets / DAYS_IN_MONTH, 1e-6))
+    mu = np.repeat(np.broadcast_to(log_daily_means[None, :, None], shape).ravel(), counts)
+    amounts = rng.standard_normal(mu.size)
+    amounts *= 0.6
+    amounts += mu
+    np.exp(amounts, out=amounts)
+
+    # (month, category, day) of each transaction, in the same order as the counts
+    month_idx, cat_idx, day_idx = (np.repeat(a.ravel(), counts) for a in np.indices(shape))
+
+    # category stored as codes into the (unique) names rather than one Python string per transaction
+    category = pd.Categorical.from_codes(cat_codes[cat_idx], categories=cat_names)
+
+    return pd.DataFrame({"month_idx": month_idx + 1, "day": day_idx + 1, "category": category, "amount": amounts})
+
+
+def build_avg_cumulative_curve(history_tx: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compute average cumulative spend fraction curve per day, per category.
+    Output: category, day, avg_cum_frac (clipped to [0.01, 0.99])
+    """
+    if history_tx.empty:
+        return pd.DataFrame(columns=["category", "day", "avg_cum_frac"])
+
+    # The key space is dense and tiny (months × categories × days): scatter the amounts into a
+    # (M, C, D) tensor and reduce along its axes instead of grouping/reindexing frames.
+    # Months/categories without any transaction are left out, as before.
+    # No key sorting needed: codes only address tensor slots (rows are month-major already)
+    m_codes, _ = pd.factorize(history_tx["month_idx"], sort=False)
+    c_codes, cats = pd.factorize(history_tx["category"], sort=False)
+    shape = (m_codes.max() + 1, len(cats), DAYS_IN_MONTH)
+
+    flat_idx = (m_codes * shape[1] + c_codes) * DAYS_IN_MONTH + (history_tx["day"].to_numpy() - 1)
+    daily = np.bincount(flat_idx, weights=history_tx["amount"].to_numpy(), minlength=np.prod(shape)).reshape(shape)
+
+    # Cumulative spend → cumulative fraction, in place on the one tensor (the last day of the
+    # cumulative sum is the monthly total; months with no spend stay all-zero)
+    cum_frac = np.cumsum(daily, axis=2, out=daily)
+    monthly_total = cum_frac[:, :, -1:].copy()
+    np.divide(cum_frac, monthly_total, out=cum_frac, where=monthly_total > 0)
+
+    avg_cum_frac = np.clip(cum_frac.mean(axis=0), 0.01, 0.99)
+
+    return pd.DataFrame(
+        {
+            "category": cats.repeat(DAYS_IN_MONTH),  # keeps the history's (categorical) dtype
+            "day": np.tile(np.arange(1, DAYS_IN_MONTH + 1), len(cats)),
+            "avg_cum_frac": avg_cum_frac.ravel(),
+        }
+    )
+
+
+@st.cache_data(show_spinner=False)
+def history_and_curve(cats_budgets: tuple, n_months: int = 3, seed: int = GLOBAL_SEED) -> tuple[pd.DataFrame, dict]:
+    """
+    Synthetic history and its average cumulative curve, cached on the (category, budget) pairs.
+    The curve comes back as {category: avg_cum_frac per day (30 values)} for O(1) lookups.
+    Nothing else feeds the simulation, so day/priority/spending changes reuse the cached result.
+    """
+    categories_df = pd.DataFrame(list(cats_budgets), columns=["category", "budget"])
+    history_tx = simulate_transaction_history(categories_df, n_months=n_months, seed=seed)
+    avg_curve = build_avg_cumulative_curve(history_tx)
+
+    curve_map = {
+        cat: g["avg_cum_frac"].to_numpy()
+        for cat, g in avg_curve.groupby("category", sort=False, observed=True)
+    }
+    return history_tx, curve_map
+
+
+def forecast_end_of_month(spent_so_far: np.ndarray, day: int, curve_map: dict, category_names) -> np.ndarray:
+    """
+    Forecast EOM spend for all categories at once using the historical cumulative fraction curve:
+        forecast = spent_so_far / avg_cum_frac(day)
+    Fallback: simple pace for categories missing from the curve.
+    """
+    # day fraction per category (NaN when the category has no history)
+    frac_day = np.array([curve_map[c][day - 1] if c in curve_map else np.nan for c in category_names])
+    frac_day = np.clip(frac_day, 0.01, 0.99)
+
+    return np.where(np.isnan(frac_day), spent_so_far * (DAYS_IN_MONTH / max(day, 1)), spent_so_far / frac_day)
+
+
+def suggest_transfers_to_target(df: pd.DataFrame, target_category: str, amount_needed: float) -> pd.DataFrame:
+    """
+    Suggest transfers FROM other categories TO the target category.
+    - lowest priority first
+    - only from categories with remaining budget
+    - cap at 30% of source budget
+    - never reduce below already spent (ensured via remaining)
+    """
+    if amount_needed <= 0:
+        return pd.DataFrame()
+
+    category = df["category"].to_numpy()
+    budget = df["budget"].to_numpy(dtype=float)
+    remaining = df["remaining"].to_numpy(dtype=float)
+    priority = df["priority"].to_numpy()
+
+    candidates = np.flatnonzero((category != target_category) & (remaining > 0))
+    if candidates.size == 0:
+        return pd.DataFrame()
+
+    # priority asc, remaining desc, budget desc (lexsort: last key is the primary one)
+    candidates = candidates[np.lexsort((-budget[candidates], -remaining[candidates], priority[candidates]))]
+
+    # Greedy allocation as a prefix sum: each source gives up to its cap, limited to what is
+    # still needed after the sources before it
+    cap = np.minimum(0.30 * budget[candidates], remaining[candidates])
+    headroom = np.maximum(0.0, amount_needed - np.concatenate(([0.0], cap.cumsum()[:-1])))
+    alloc = np.minimum(cap, headroom)
+    moved = alloc > 0
+
+    out = pd.DataFrame(
+        {
+            "from_category": category[candidates][moved],
+            "from_priority": priority[candidates][moved],
+            "to_category": target_category,
+            "amount_moved": alloc[moved],
+        }
+    )
+    if not out.empty:
+        out.attrs["uncovered_amount"] = float(max(0.0, amount_needed - alloc.sum()))
+    return out
+
+
+def highlight_gap(gap: pd.Series) -> np.ndarray:
+    # overspend positive → red; surplus negative/zero → green (styles for the whole column at once)
+    return np.where(gap.to_numpy(dtype=float) > 0, "color: red; font-weight: 700;", "color: green;")
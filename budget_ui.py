@@ -0,0 +1,180 @@
+import math
+
+import streamlit as st
+import pandas as pd
+import numpy as np
+
+# -----------------------------
+# Shared UI for sections 1 (budget setup) and 2 (spending monitoring) of app2.py / app3.py
+# -----------------------------
+# Immutable defaults (category, budget, priority), built once at import; EXTENDED covers
+# every position of the "Number of categories" slider (up to 6) in app4/app5
+DEFAULTS = (
+    ("Groceries", 350.0, 5),
+    ("Eating out", 250.0, 3),
+    ("Leisure", 200.0, 2),
+    ("Transport", 100.0, 4),
+)
+EXTENDED = DEFAULTS + tuple((f"Category {i+1}", 100.0, 3) for i in range(len(DEFAULTS), 6))
+
+
+@st.cache_data(show_spinner=False)
+def build_plan_arrays(categories_tuple: tuple, spending_tuple: tuple) -> dict:
+    """
+    Build the per-category plan as plain arrays (budget, priority, spending and derived values).
+    The table has at most a handful of rows, so pandas is only used when a table is rendered.
+    Keys match the budget table column names, so pd.DataFrame(plan) gives the table back.
+    """
+    # Euro amounts stay float64 (shown in tables as entered); priorities (1-5) fit in int8
+    budgets = np.array([c[1] for c in categories_tuple], dtype=float)
+    spent = np.asarray(spending_tuple, dtype=float)
+
+    return {
+        "category": [c[0] for c in categories_tuple],
+        "budget": budgets,
+        "priority": np.array([c[2] for c in categories_tuple], dtype=np.int8),
+        "spent_so_far": spent,
+        "remaining": budgets - spent,
+        "overspend_now": spent - budgets,  # positive means already overspent
+    }
+
+
+@st.cache_data(show_spinner=False)
+def allocate_in_order(
+    budgets: np.ndarray, remaining: np.ndarray, idx: np.ndarray, amount: float
+) -> tuple[np.ndarray, np.ndarray, float]:
+    """
+    Greedy reallocation shared by app2.py / app3.py: drain the source rows `idx` (already in
+    reallocation order, all with remaining budget) until `amount` is covered. Each source gives
+    at most 30% of its budget and never more than its remaining budget (so never below spent).
+    Returns (source row indices, amounts moved, amount that could not be covered).
+    """
+    if amount <= 0 or idx.size == 0:
+        return np.empty(0, dtype=np.intp), np.empty(0), max(0.0, amount)
+
+    caps = np.minimum(0.30 * budgets[idx], remaining[idx])
+
+    # Sources are drained in order until the running total of their caps covers the amount
+    cum_caps = np.cumsum(caps)
+    k = min(int(np.searchsorted(cum_caps, amount)), len(caps) - 1)
+
+    moves = caps[: k + 1].copy()
+    moves[k] = min(caps[k], amount - (cum_caps[k - 1] if k > 0 else 0.0))
+
+    # Also report how much we *couldn't* cover (if caps prevent reaching the target)
+    return idx[: k + 1], moves, float(max(0.0, amount - cum_caps[-1]))
+
+
+def collect_budget_inputs() -> tuple[float, list[dict], list[float]]:
+    """
+    Section 1 inputs: income, total budget and the category table (budget, priority, current spending).
+    Returns (total_budget, categories, spending); stops the script if no category has a name.
+    """
+    st.header("1) Budget setup")
+
+    # All plan inputs live in one form: edits are batched and only applied on submit
+    with st.form("budget_form"):
+        col1, col2 = st.columns(2)
+        with col1:
+            st.number_input("Monthly income (€)", min_value=0.0, value=2500.0, step=50.0)
+        with col2:
+            total_budget = st.number_input("Total monthly spending budget (€)", min_value=0.0, value=1600.0, step=50.0)
+
+        st.markdown("Define category budgets, priorities (1 = low priority, 5 = high priority) and current spending.")
+
+        # One editable table for names, budgets, priorities and current spending (rows can be added/removed)
+        edited = st.data_editor(
+            pd.DataFrame(DEFAULTS, columns=["category", "budget", "priority"]).assign(spent_so_far=lambda d: d["budget"] * 0.6),
+            num_rows="dynamic",
+            column_config={
+                "category": st.column_config.TextColumn("Category"),
+                "budget": st.column_config.NumberColumn("Budget (€)", min_value=0.0, step=10.0),
+                "priority": st.column_config.NumberColumn("Priority", min_value=1, max_value=5, step=1),
+                "spent_so_far": st.column_config.NumberColumn("Current spent (€)", min_value=0.0, step=10.0),
+            },
+            use_container_width=True,
+            key="cats",
+        )
+
+        st.caption(
+            "For prototyping purposes, you can simulate current spending per category. "
+            "Later, this could be replaced by real transaction data."
+        )
+
+        st.form_submit_button("Update plan")
+
+    # Newly added rows start empty: fill sensible defaults, then remove empty names
+    edited = edited.fillna({"category": "", "budget": 0.0, "priority": 3})
+    edited["spent_so_far"] = edited["spent_so_far"].fillna(edited["budget"] * 0.6)
+    edited["category"] = edited["category"].astype(str).str.strip()
+    edited = edited[edited["category"] != ""].astype({"budget": float, "priority": int, "spent_so_far": float})
+
+    categories = edited[["category", "budget", "priority"]].to_dict("records")
+    spending = edited["spent_so_far"].tolist()
+
+    if len(categories) == 0:
+        st.error("Please add at least one category (category name cannot be empty).")
+        st.stop()
+
+    return float(total_budget), categories, spending
+
+
+def load_plan(categories: list[dict], spending: list[float]) -> tuple[dict, np.ndarray, float, float]:
+    """
+    Return (plan arrays, reallocation order, total planned, total spent) for the given inputs.
+    Derived values only depend on the plan inputs: they are rebuilt when the inputs change,
+    otherwise (e.g. when only the day slider moved) reused from the session.
+    """
+    # Hashable snapshot of the inputs, used as cache key
+    categories_key = tuple((c["category"], c["budget"], c["priority"]) for c in categories)
+
+    inputs_hash = hash((categories_key, tuple(spending)))
+    if st.session_state.get("inputs_hash") != inputs_hash:
+        plan = build_plan_arrays(categories_key, tuple(spending))
+        st.session_state["plan"] = plan
+        # Reallocation order (priority asc, remaining desc, budget desc); only changes with the inputs
+        st.session_state["order"] = np.lexsort((-plan["budget"], -plan["remaining"], plan["priority"]))
+        # Plain-list sums: cheaper than an array reduction for a handful of rows
+        st.session_state["totals"] = (math.fsum(c["budget"] for c in categories), math.fsum(spending))
+        st.session_state["inputs_hash"] = inputs_hash
+
+    total_planned, total_spent = st.session_state["totals"]
+    return st.session_state["plan"], st.session_state["order"], total_planned, total_spent
+
+
+def show_allocation_check(total_budget: float, total_planned: float):
+    """Informative check of category budgets against the total monthly budget."""
+    allocation_gap = total_budget - total_planned  # + = unallocated, - = overallocated
+
+    st.subheader("Allocation check")
+
+    cA, cB = st.columns(2)
+    cA.metric("Total allocated across categories (€)", f"{total_planned:,.0f}")
+    cB.metric("Remaining to allocate (€)", f"{allocation_gap:,.0f}")
+
+    if allocation_gap > 0:
+        st.info(
+            f"You still have **€{allocation_gap:,.0f}** unallocated. "
+            "You can distribute it across categories."
+        )
+    elif allocation_gap < 0:
+        st.error(
+            f"You are **€{abs(allocation_gap):,.0f}** over budget. "
+            "Reduce one or more category budgets to stay within the total limit."
+        )
+    else:
+        st.success("Perfect! Your category budgets add up exactly to your total monthly budget.")
+
+    if total_budget > 0:
+        pct = min(total_planned / total_budget, 1.0)
+        st.progress(pct, text=f"Allocated {total_planned:,.0f} / {total_budget:,.0f} (€)")
+
+
+def show_spending_summary(total_budget: float, total_planned: float, total_spent: float):
+    """Section 2: planned vs spent vs total limit."""
+    st.header("2) Spending monitoring (prototype simulation)")
+
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Planned category budgets (€)", f"{total_planned:,.0f}")
+    c2.metric("Total spent so far (€)", f"{total_spent:,.0f}")
+    c3.metric("Total budget limit (€)", f"{total_budget:,.0f}")